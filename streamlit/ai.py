@@ -28,6 +28,12 @@ def crop_to_circle(image):
     return result
 
 
+# Cropped once per server process instead of on every rerun
+@st.cache_resource
+def load_circular_image(path):
+    return crop_to_circle(Image.open(path))
+
+
 # Title
 st.title(f"Get info about the {os.getenv('NAME_OF_WEBSITE')} website")
 
@@ -93,10 +99,8 @@ if submit_button and prompt:
 st.write("## Conversation History")
 
 # Load images outside the loop to optimize performance
-human_image = Image.open('images/human_face.png')
-robot_image = Image.open('images/robot_face.jpg')
-circular_human_image = crop_to_circle(human_image)
-circular_robot_image = crop_to_circle(robot_image)
+circular_human_image = load_circular_image('images/human_face.png')
+circular_robot_image = load_circular_image('images/robot_face.jpg')
 
 # logger.info(st.session_state['history'])
 
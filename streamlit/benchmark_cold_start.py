@@ -0,0 +1,75 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Each measurement runs in a fresh interpreter so nothing is already imported,
+# like on a Lambda cold start or a new Streamlit server process. Importing
+# invoke_agent includes warm_up(), i.e. creating the Bedrock and OpenSearch
+# clients, so the measured time is the whole init phase.
+COLD_START_SNIPPET = """
+import time
+start = time.perf_counter()
+import invoke_agent
+elapsed = time.perf_counter() - start
+if invoke_agent.get_opensearch_client.cache_info().currsize == 0:
+    raise SystemExit("warm_up() failed, the measurement would not include creating the clients")
+print(elapsed)
+"""
+
+# Creating the clients does not call AWS, so placeholder values are enough
+# unless --real-credentials is given.
+PLACEHOLDER_ENV = {
+    "AWS_REGION": "us-east-1",
+    "OPENSEARCH_HOST": "benchmark.us-east-1.aoss.amazonaws.com",
+    "AWS_ACCESS_KEY_ID": "benchmark",
+    "AWS_SECRET_ACCESS_KEY": "benchmark",
+}
+
+
+def measure(snippet, runs, env):
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", snippet],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(result.stderr, file=sys.stderr)
+            sys.exit(f"Measurement failed with exit code {result.returncode}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def report(name, timings):
+    print(f"{name}: median {statistics.median(timings) * 1000:.1f} ms "
+          f"min {min(timings) * 1000:.1f} ms max {max(timings) * 1000:.1f} ms ({len(timings)} runs)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the cold start of the query path.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--real-credentials", action="store_true",
+                        help="use the AWS configuration of the environment instead of placeholders")
+    parser.add_argument("--max-ms", type=float,
+                        help="exit with an error if the median cold start is above this value")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.real_credentials:
+        env.setdefault("AWS_REGION", PLACEHOLDER_ENV["AWS_REGION"])
+    else:
+        env.update(PLACEHOLDER_ENV)
+        env.pop("AWS_SESSION_TOKEN", None)
+        env.pop("AWS_PROFILE", None)
+
+    timings = measure(COLD_START_SNIPPET, args.runs, env)
+    report("import invoke_agent + warm_up", timings)
+
+    if args.max_ms is not None and statistics.median(timings) * 1000 > args.max_ms:
+        print(f"Cold start regression: median above {args.max_ms} ms")
+        sys.exit(1)
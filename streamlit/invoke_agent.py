@@ -5,7 +5,7 @@ import io
 import sys
 import boto3
 
-from boto3.session import Session
+from functools import lru_cache
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from requests import request
@@ -29,26 +29,71 @@ os.environ["AWS_REGION"] = region
 aoss_host = os.getenv("OPENSEARCH_HOST")
 
 service = "aoss"
-bedrock = boto3.client("bedrock-runtime", region_name=region)
 
 
 # ---------------------------------------------------------------------
-# HELPER FUNCTION TO GET AWS CREDENTIALS SAFELY
+# HELPER FUNCTIONS TO GET AWS CREDENTIALS SAFELY
 # ---------------------------------------------------------------------
-def get_frozen_credentials():
+def get_credentials():
     """
-    Safely obtain frozen AWS credentials from the current Boto3 Session.
+    Obtain the (refreshable) AWS credentials of the current Boto3 Session.
     Raise an error if credentials are not found to clarify what's missing.
     """
-    session = Session()
-    creds = session.get_credentials()
+    creds = boto3.Session().get_credentials()
     if not creds:
         raise EnvironmentError(
             "No valid AWS credentials found. Ensure you've configured AWS credentials "
             "correctly (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, etc.) or set up an "
             "AWS profile that Boto3 can discover."
         )
-    return creds.get_frozen_credentials()
+    return creds
+
+
+def get_frozen_credentials():
+    """
+    Safely obtain frozen AWS credentials from the current Boto3 Session.
+    Raise an error if credentials are not found to clarify what's missing.
+    """
+    return get_credentials().get_frozen_credentials()
+
+
+# ---------------------------------------------------------------------
+# CACHED CLIENTS (reused across warm Lambda invocations and Streamlit reruns)
+# ---------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def get_bedrock_client():
+    return boto3.client("bedrock-runtime", region_name=region)
+
+
+@lru_cache(maxsize=None)
+def get_opensearch_client():
+    # Refreshable credentials keep the cached client valid when temporary
+    # credentials rotate.
+    awsauth = AWS4Auth(region=region, service=service, refreshable_credentials=get_credentials())
+
+    return OpenSearch(
+        hosts=[{'host': aoss_host, 'port': 443}],
+        http_auth=awsauth,
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        pool_maxsize=20,
+    )
+
+
+def warm_up():
+    """
+    Creates the cached clients ahead of the first question.
+    """
+    return get_bedrock_client(), get_opensearch_client()
+
+
+# Create the clients during the Lambda init phase instead of in the first
+# request. A failure is retried by the first askQuestion call.
+try:
+    warm_up()
+except Exception as e:
+    print(f"Warm up of the AWS clients failed: {e}")
 
 
 # ---------------------------------------------------------------------
@@ -113,7 +158,7 @@ def invoke_model(prompt):
     }
     # Convert the native request to JSON.
     request = json.dumps(native_request)
-    response = bedrock.invoke_model(modelId=model_id, body=request)
+    response = get_bedrock_client().invoke_model(modelId=model_id, body=request)
     # Decode the response body.
     model_response = json.loads(response["body"].read())
     # Extract and print the response text.
@@ -129,10 +174,7 @@ def askQuestion(question):
     Sends a JSON POST request to the Bedrock Agent endpoint and returns the
     captured output (for debugging) and the final LLM response text.
     """
-    credentials = boto3.Session().get_credentials()
-    awsauth = AWS4Auth(credentials.access_key, credentials.secret_key, region, service, session_token=credentials.token)
-
-    response = bedrock.invoke_model(
+    response = get_bedrock_client().invoke_model(
         modelId=os.getenv('TEXT_EMBEDDING_MODEL'),
         contentType="application/json",
         accept="application/json",
@@ -140,16 +182,7 @@ def askQuestion(question):
     )
     query_vector = json.loads(response['body'].read())['embedding']
 
-    opensearch_client = OpenSearch(
-        hosts=[{'host': aoss_host, 'port': 443}],
-        http_auth=awsauth,
-        use_ssl=True,
-        verify_certs=True,
-        connection_class=RequestsHttpConnection,
-        pool_maxsize=20,
-    )
-
-    response = opensearch_client.search(
+    response = get_opensearch_client().search(
         index=os.getenv("OPENSEARCH_INDEX"),
         body={
             "size": int(os.getenv("OPENSEARCH_MAX_RESULT")),
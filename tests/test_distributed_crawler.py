@@ -0,0 +1,228 @@
+import functools
+import multiprocessing
+import os
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+from utils.crawler import Crawler
+from utils.distributed_crawler import CrawlCoordinator
+from utils.frontier import Frontier, SQLiteFrontier, partition_for_url
+
+STARTURL = "http://example.com/"
+
+# Small fake site: the start page links to p0..p9, every page links back to the
+# start page, to another page and to a leaf page q<i>.
+SITE = {STARTURL: [STARTURL + f"p{i}" for i in range(10)]}
+for i in range(10):
+    SITE[STARTURL + f"p{i}"] = [STARTURL, STARTURL + f"p{(i * 3) % 10}", STARTURL + f"q{i}"]
+ALL_URLS = {STARTURL} | {STARTURL + f"p{i}" for i in range(10)} | {STARTURL + f"q{i}" for i in range(10)}
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = SQLiteFrontier(str(tmp_path / "frontier.db"), 4)
+    yield frontier
+    frontier.close()
+
+
+@pytest.fixture
+def fake_site(tmp_path, monkeypatch):
+    # Workers are forked, so the patched methods are used by the worker processes.
+    monkeypatch.chdir(tmp_path)
+
+    def download_url(self, url):
+        self.site_docs[url] = [Document(page_content=url, metadata={"url": url})]
+        return url
+
+    monkeypatch.setattr(Crawler, "download_url", download_url)
+    monkeypatch.setattr(Crawler, "get_linked_urls", staticmethod(lambda url, html: iter(SITE.get(url, []))))
+
+
+def make_coordinator(tmp_path, max_sites=1000, max_restarts=3, lease_timeout=600):
+    return CrawlCoordinator(
+        starturl=STARTURL,
+        frontier_factory=functools.partial(
+            SQLiteFrontier, str(tmp_path / "frontier.db"), 4, lease_timeout=lease_timeout
+        ),
+        num_workers=4,
+        max_sites=max_sites,
+        poll_interval=0.2,
+        max_restarts=max_restarts,
+        mp_context=multiprocessing.get_context("fork"),
+    )
+
+
+def test_partition_depends_on_host_and_path():
+    assert partition_for_url("http://Example.com/a?x=1", 8) == partition_for_url("http://example.com/a", 8)
+    assert {partition_for_url(STARTURL + f"p{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_urls_are_claimed_by_their_partition_only(frontier):
+    url = STARTURL + "page"
+    owner = frontier.partition_for_url(url)
+    frontier.add_urls([url])
+
+    for partition in range(4):
+        if partition != owner:
+            assert frontier.claim_url(partition, max_sites=10) is None
+    assert frontier.claim_url(owner, max_sites=10) == url
+
+
+def test_urls_are_deduplicated_across_connections(frontier, tmp_path):
+    other = SQLiteFrontier(str(tmp_path / "frontier.db"), 4)
+    frontier.add_urls([STARTURL, STARTURL])
+    other.add_urls([STARTURL])
+    other.close()
+
+    assert frontier.stats()["todo"] == 1
+
+
+def test_claims_stop_at_max_sites(frontier):
+    urls = [STARTURL + f"p{i}" for i in range(20)]
+    frontier.add_urls(urls)
+
+    claimed = []
+    for partition in range(4):
+        while (url := frontier.claim_url(partition, max_sites=3)) is not None:
+            claimed.append(url)
+    assert len(claimed) == 3
+
+    for url in claimed:
+        frontier.complete_url(url)
+    assert frontier.is_finished(max_sites=3)
+
+
+def test_not_finished_while_urls_are_in_progress(frontier):
+    frontier.add_urls([STARTURL])
+    partition = frontier.partition_for_url(STARTURL)
+
+    assert not frontier.is_finished(max_sites=10)
+    frontier.claim_url(partition, max_sites=10)
+    assert not frontier.is_finished(max_sites=10)
+    frontier.complete_url(STARTURL, [Document(page_content="start", metadata={})])
+    assert frontier.is_finished(max_sites=10)
+    assert frontier.get_site_docs()[STARTURL][0].page_content == "start"
+
+
+def test_expired_claims_are_requeued(tmp_path):
+    frontier = SQLiteFrontier(str(tmp_path / "frontier.db"), 1, lease_timeout=0)
+    frontier.add_urls([STARTURL])
+
+    assert frontier.claim_url(0, max_sites=1) == STARTURL
+    assert frontier.claim_url(0, max_sites=1) == STARTURL
+    frontier.close()
+
+
+def test_released_claims_can_be_claimed_again(frontier):
+    frontier.add_urls([STARTURL])
+    partition = frontier.partition_for_url(STARTURL)
+    frontier.claim_url(partition, max_sites=1)
+
+    assert frontier.release_claims(partition) == 1
+    assert frontier.claim_url(partition, max_sites=1) == STARTURL
+
+
+def test_url_fails_after_max_attempts(tmp_path):
+    frontier = SQLiteFrontier(str(tmp_path / "frontier.db"), 1, max_attempts=2)
+    frontier.add_urls([STARTURL])
+
+    for _ in range(2):
+        assert frontier.claim_url(0, max_sites=10) == STARTURL
+        frontier.release_claims(0)
+
+    assert frontier.claim_url(0, max_sites=10) is None
+    assert frontier.stats() == {"todo": 0, "in_progress": 0, "done": 0, "failed": 1}
+    assert frontier.is_finished(max_sites=10)
+    frontier.close()
+
+
+def test_stale_partition_is_taken_over(tmp_path):
+    frontier = SQLiteFrontier(str(tmp_path / "frontier.db"), 4, lease_timeout=0.2)
+    frontier.reset()
+    urls = [STARTURL + f"p{i}" for i in range(20)]
+    frontier.add_urls(urls)
+    hung_partition = frontier.partition_for_url(urls[0])
+    hung_url = frontier.claim_url(hung_partition, max_sites=100)
+    other_partition = (hung_partition + 1) % 4
+
+    # Until the lease runs out the other worker only gets its own urls.
+    while (url := frontier.claim_url(other_partition, max_sites=100)) is not None:
+        assert frontier.partition_for_url(url) == other_partition
+        frontier.complete_url(url)
+
+    time.sleep(0.3)
+    assert hung_partition in frontier.stale_partitions()
+    taken_over = []
+    while (url := frontier.claim_url(other_partition, max_sites=100)) is not None:
+        taken_over.append(url)
+        frontier.complete_url(url)
+    assert hung_url in taken_over
+    assert frontier.stats()["todo"] == 0
+    frontier.close()
+
+
+def test_incomplete_frontier_cannot_be_created():
+    class IncompleteFrontier(Frontier):
+        def add_urls(self, urls):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteFrontier(2)
+
+
+def test_coordinator_crawls_every_page_once(tmp_path, fake_site):
+    coordinator = make_coordinator(tmp_path)
+    coordinator.run()
+
+    site_docs = coordinator.get_site_docs()
+    assert set(site_docs) == ALL_URLS
+    assert coordinator.frontier.stats() == {"todo": 0, "in_progress": 0, "done": len(ALL_URLS), "failed": 0}
+
+
+def test_coordinator_respects_max_sites(tmp_path, fake_site):
+    coordinator = make_coordinator(tmp_path, max_sites=5)
+    coordinator.run()
+
+    assert len(coordinator.get_site_docs()) == 5
+
+
+def fail_on(tmp_path, monkeypatch, fail_url, fail, times=1):
+    marker = tmp_path / "failures"
+    download_url = Crawler.download_url
+
+    def failing_download_url(self, url):
+        if url == fail_url and (not marker.exists() or len(marker.read_text()) < times):
+            with open(marker, "a") as file:
+                file.write("x")
+            fail()
+        return download_url(self, url)
+
+    monkeypatch.setattr(Crawler, "download_url", failing_download_url)
+
+
+def test_dead_worker_is_restarted(tmp_path, monkeypatch, fake_site):
+    fail_on(tmp_path, monkeypatch, STARTURL + "p3", lambda: os._exit(1))
+    coordinator = make_coordinator(tmp_path)
+    coordinator.run()
+
+    assert set(coordinator.get_site_docs()) == ALL_URLS
+
+
+def test_hung_worker_is_restarted(tmp_path, monkeypatch, fake_site):
+    fail_on(tmp_path, monkeypatch, STARTURL + "p3", lambda: time.sleep(3600))
+    coordinator = make_coordinator(tmp_path, lease_timeout=3)
+    coordinator.run()
+
+    assert set(coordinator.get_site_docs()) == ALL_URLS
+
+
+def test_url_killing_its_worker_fails_without_stopping_the_crawl(tmp_path, monkeypatch, fake_site):
+    fail_on(tmp_path, monkeypatch, STARTURL + "p3", lambda: os._exit(1), times=100)
+    coordinator = make_coordinator(tmp_path)
+    coordinator.run()
+
+    # q3 is only linked from p3.
+    assert set(coordinator.get_site_docs()) == ALL_URLS - {STARTURL + "p3", STARTURL + "q3"}
+    assert coordinator.frontier.stats()["failed"] == 1
@@ -15,12 +15,13 @@ logger = logging.getLogger(__name__)
 
 class Crawler:
 
-    def __init__(self, starturl, max_sites=100):
+    def __init__(self, starturl, max_sites=100, request_timeout=30):
         self.starturl = starturl
         self.visited_urls = []
         self.urls_to_visit = [starturl]
         self.site_docs = {}
         self.max_sites = max_sites
+        self.request_timeout = request_timeout
         self.done_sites = 0
         self.request_session = requests.Session()
 
@@ -44,7 +45,7 @@ class Crawler:
             with open(file_name, "rb") as file:
                 url_text = file.read()
         else:
-            response = self.request_session.get(url)
+            response = self.request_session.get(url, timeout=self.request_timeout)
             url_text = response.content.decode(response.encoding).encode("utf-8")
             fh = open(file_name, 'wb')
             fh.write(url_text)
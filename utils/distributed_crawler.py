@@ -0,0 +1,158 @@
+import logging
+import multiprocessing
+import time
+
+from utils.crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlWorker(Crawler):
+    """
+    Crawls the urls of one partition of a shared frontier. Discovered links are
+    written to the frontier, which routes them to the worker owning them.
+    """
+
+    def __init__(self, starturl, frontier, worker_id, max_sites=100, poll_interval=1):
+        super().__init__(starturl=starturl, max_sites=max_sites)
+        self.frontier = frontier
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+
+    def crawl(self, url):
+        html = self.download_url(url)
+        self.frontier.add_urls(
+            [linked_url for linked_url in Crawler.get_linked_urls(url, html)
+             if linked_url and linked_url.startswith(self.starturl)]
+        )
+
+    def run(self):
+        while True:
+            url = self.frontier.claim_url(self.worker_id, self.max_sites)
+            if url is None:
+                if self.frontier.is_finished(self.max_sites):
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            logging.info(f'Worker {self.worker_id} crawling: {url}')
+            try:
+                self.crawl(url)
+            except Exception:
+                logging.exception(f'Worker {self.worker_id} failed to crawl: {url}')
+                self.frontier.complete_url(url, failed=True)
+            else:
+                self.frontier.complete_url(url, self.site_docs.pop(url, None))
+            self.done_sites += 1
+
+        logging.info(f'Worker {self.worker_id} finished after {self.done_sites} sites')
+
+
+def run_worker(starturl, frontier_factory, worker_id, max_sites=100):
+    """
+    Entry point of a worker process. Also usable to start workers on other hosts
+    against a coordinator running with start_workers=False; start them after the
+    coordinator has seeded the frontier, since seeding resets it.
+    """
+    frontier = frontier_factory()
+    try:
+        CrawlWorker(starturl=starturl, frontier=frontier, worker_id=worker_id, max_sites=max_sites).run()
+    finally:
+        frontier.close()
+
+
+class CrawlCoordinator:
+    """
+    Seeds a shared frontier, starts one local process per partition and reports
+    the aggregated progress until all workers are done. A worker process that
+    exits with an error, or hangs until its partition goes stale, is stopped, gets
+    its claims released and is restarted, up to max_restarts times per partition.
+    After that the partition is left to the other workers, which take over the
+    urls of stale partitions.
+
+    With start_workers=False the coordinator only seeds and monitors the frontier,
+    and the workers (run_worker) are started elsewhere, one per partition, against
+    a frontier backend reachable from every host. Partitions of workers that are
+    lost there are taken over by the remaining workers. The SQLite frontier is
+    single box only.
+
+    frontier_factory has to be picklable (e.g. functools.partial(SQLiteFrontier, path, n))
+    because each worker process creates its own frontier connection.
+    """
+
+    def __init__(self, starturl, frontier_factory, num_workers, max_sites=100, poll_interval=5,
+                 start_workers=True, max_restarts=3, mp_context=None):
+        self.starturl = starturl
+        self.frontier_factory = frontier_factory
+        self.num_workers = num_workers
+        self.max_sites = max_sites
+        self.poll_interval = poll_interval
+        self.start_workers = start_workers
+        self.max_restarts = max_restarts
+        self.mp_context = mp_context or multiprocessing.get_context()
+        self.frontier = frontier_factory()
+
+        if self.frontier.num_partitions != num_workers:
+            raise ValueError(
+                f"Frontier has {self.frontier.num_partitions} partitions but {num_workers} workers were requested"
+            )
+
+    def start_worker(self, worker_id):
+        worker = self.mp_context.Process(
+            target=run_worker,
+            args=(self.starturl, self.frontier_factory, worker_id, self.max_sites),
+            name=f"crawl-worker-{worker_id}",
+        )
+        worker.start()
+        return worker
+
+    def run(self):
+        self.frontier.reset()
+        self.frontier.add_urls([self.starturl])
+
+        if self.start_workers:
+            self.run_workers()
+        else:
+            while not self.frontier.is_finished(self.max_sites):
+                time.sleep(self.poll_interval)
+                logging.info(f'Crawl progress: {self.frontier.stats()}')
+
+        print(f"Status: {self.frontier.stats()}")
+
+    def run_workers(self):
+        workers = {worker_id: self.start_worker(worker_id) for worker_id in range(self.num_workers)}
+        restarts = {worker_id: 0 for worker_id in workers}
+
+        try:
+            while workers:
+                for worker_id, worker in list(workers.items()):
+                    worker.join(timeout=self.poll_interval / self.num_workers)
+                    if worker.is_alive():
+                        if worker_id not in self.frontier.stale_partitions():
+                            continue
+                        logger.error(f'{worker.name} stopped claiming urls, terminating it')
+                        worker.terminate()
+                        worker.join()
+                    elif worker.exitcode == 0:
+                        del workers[worker_id]
+                        continue
+                    else:
+                        logger.error(f'{worker.name} exited with code {worker.exitcode}')
+
+                    del workers[worker_id]
+                    if restarts[worker_id] >= self.max_restarts:
+                        logger.error(f'{worker.name} failed {restarts[worker_id] + 1} times, '
+                                     f'leaving its partition to the other workers')
+                        continue
+                    restarts[worker_id] += 1
+                    self.frontier.release_claims(worker_id)
+                    workers[worker_id] = self.start_worker(worker_id)
+                logging.info(f'Crawl progress: {self.frontier.stats()}')
+        finally:
+            for worker in workers.values():
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+    def get_site_docs(self):
+        return self.frontier.get_site_docs()
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from langchain_core.documents import Document
+
+STATUS_TODO = "todo"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUSES = (STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE, STATUS_FAILED)
+
+
+def partition_for_url(url, num_partitions):
+    """
+    Returns the partition (worker index) owning the url. The partition is derived
+    from a hash of host and path so every process agrees on the owner of a url.
+    """
+    parsed = urlparse(url)
+    key = (parsed.netloc.lower() + parsed.path).encode('utf-8')
+    return int(hashlib.md5(key).hexdigest(), 16) % num_partitions
+
+
+class Frontier(ABC):
+    """
+    Shared crawl state of a distributed crawl: the urls still to visit, the set of
+    known urls used for deduplication and the docs produced by the workers.
+    Implement this interface to share the frontier over something other than
+    a local SQLite file.
+    """
+
+    def __init__(self, num_partitions):
+        self.num_partitions = num_partitions
+
+    def partition_for_url(self, url):
+        return partition_for_url(url, self.num_partitions)
+
+    @abstractmethod
+    def reset(self):
+        """Forgets all urls and docs of a previous crawl."""
+
+    @abstractmethod
+    def add_urls(self, urls):
+        """Adds urls not seen before to the partition owning them."""
+
+    @abstractmethod
+    def claim_url(self, partition, max_sites):
+        """
+        Returns the next url for the worker of the partition to crawl, or None if
+        there is none. Calling it also signals that the worker is alive; urls of
+        partitions whose worker stopped doing so can be handed out to other workers.
+        """
+
+    @abstractmethod
+    def complete_url(self, url, docs=None, failed=False):
+        """Marks a claimed url as done and stores the docs created from it."""
+
+    @abstractmethod
+    def release_claims(self, partition):
+        """
+        Puts the urls claimed by the (dead) worker of a partition back to todo and
+        gives the partition a fresh heartbeat for its new worker.
+        """
+
+    @abstractmethod
+    def stale_partitions(self):
+        """Returns the partitions whose worker has not claimed urls for too long."""
+
+    @abstractmethod
+    def is_finished(self, max_sites):
+        """True if the crawl is idle and no more urls will be crawled."""
+
+    @abstractmethod
+    def stats(self):
+        """Returns the number of urls per status over all partitions."""
+
+    @abstractmethod
+    def get_site_docs(self):
+        """Returns the docs of all crawled urls by url."""
+
+    def close(self):
+        pass
+
+
+class SQLiteFrontier(Frontier):
+    """
+    Frontier kept in a SQLite file. Good for several worker processes on one box
+    and for tests; every process opens its own connection to the same file.
+    The file uses WAL mode, so it must not be shared between hosts or put on a
+    network filesystem.
+
+    Every claim_url call records a heartbeat for the partition. When a partition
+    has had no heartbeat for lease_timeout seconds, its expired claims go back to
+    todo and its urls are handed out to the workers of the other partitions. A url
+    whose claim was lost max_attempts times is marked failed.
+    """
+
+    def __init__(self, db_path, num_partitions, timeout=60, lease_timeout=600, max_attempts=3):
+        super().__init__(num_partitions)
+        self.db_path = db_path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL UNIQUE,"
+            " partition INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " updated REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS urls_partition_status ON urls (partition, status, seq)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS urls_status_updated ON urls (status, updated)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " url TEXT PRIMARY KEY,"
+            " docs TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS heartbeats ("
+            " partition INTEGER PRIMARY KEY,"
+            " heartbeat REAL NOT NULL)"
+        )
+        # Number of urls per status, kept up to date with every status change so
+        # claims and the workers polling for the end of the crawl do not have to
+        # count the urls table.
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            " name TEXT PRIMARY KEY,"
+            " value INTEGER NOT NULL)"
+        )
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+            [(status,) for status in STATUSES]
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so reads and writes in
+        # the transaction happen atomically across processes.
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    @staticmethod
+    def _count(cursor, status, delta):
+        if delta:
+            cursor.execute("UPDATE counters SET value = value + ? WHERE name = ?", (delta, status))
+
+    def reset(self):
+        now = time.time()
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM urls")
+            cursor.execute("DELETE FROM docs")
+            cursor.execute("UPDATE counters SET value = 0")
+            # Partitions whose worker never shows up become stale after lease_timeout.
+            cursor.execute("DELETE FROM heartbeats")
+            cursor.executemany(
+                "INSERT INTO heartbeats (partition, heartbeat) VALUES (?, ?)",
+                [(partition, now) for partition in range(self.num_partitions)]
+            )
+
+    def add_urls(self, urls):
+        now = time.time()
+        rows = [(url, self.partition_for_url(url), STATUS_TODO, now) for url in urls if url]
+        if not rows:
+            return
+        with self._transaction() as cursor:
+            added = cursor.executemany(
+                "INSERT OR IGNORE INTO urls (url, partition, status, updated) VALUES (?, ?, ?, ?)",
+                rows
+            ).rowcount
+            self._count(cursor, STATUS_TODO, added)
+
+    def _requeue(self, cursor, condition, params):
+        # Every lost claim counts as an attempt, so a url that keeps killing or
+        # hanging its worker ends up failed instead of being retried forever.
+        failed = cursor.execute(
+            f"UPDATE urls SET status = ?, attempts = attempts + 1, updated = ?"
+            f" WHERE status = ? AND attempts + 1 >= ? AND {condition}",
+            (STATUS_FAILED, time.time(), STATUS_IN_PROGRESS, self.max_attempts) + params
+        ).rowcount
+        requeued = cursor.execute(
+            f"UPDATE urls SET status = ?, attempts = attempts + 1, updated = ?"
+            f" WHERE status = ? AND {condition}",
+            (STATUS_TODO, time.time(), STATUS_IN_PROGRESS) + params
+        ).rowcount
+        self._count(cursor, STATUS_IN_PROGRESS, -(failed + requeued))
+        self._count(cursor, STATUS_FAILED, failed)
+        self._count(cursor, STATUS_TODO, requeued)
+        return failed + requeued
+
+    def _stale_partitions(self, cursor, now):
+        return [row[0] for row in cursor.execute(
+            "SELECT partition FROM heartbeats WHERE heartbeat < ?", (now - self.lease_timeout,)
+        )]
+
+    def claim_url(self, partition, max_sites):
+        with self._transaction() as cursor:
+            now = time.time()
+            cursor.execute(
+                "INSERT OR REPLACE INTO heartbeats (partition, heartbeat) VALUES (?, ?)", (partition, now)
+            )
+            self._requeue(cursor, "updated < ?", (now - self.lease_timeout,))
+            stats = self._counters(cursor)
+            if stats[STATUS_TODO] == 0:
+                return None
+            if stats[STATUS_IN_PROGRESS] + stats[STATUS_DONE] + stats[STATUS_FAILED] >= max_sites:
+                return None
+            row = cursor.execute(
+                "SELECT seq, url FROM urls WHERE partition = ? AND status = ? ORDER BY seq LIMIT 1",
+                (partition, STATUS_TODO)
+            ).fetchone()
+            if row is None:
+                # Take over the urls of a partition whose worker is hung or gone.
+                for stale_partition in self._stale_partitions(cursor, now):
+                    row = cursor.execute(
+                        "SELECT seq, url FROM urls WHERE partition = ? AND status = ? ORDER BY seq LIMIT 1",
+                        (stale_partition, STATUS_TODO)
+                    ).fetchone()
+                    if row is not None:
+                        break
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE urls SET status = ?, updated = ? WHERE seq = ?",
+                (STATUS_IN_PROGRESS, now, row[0])
+            )
+            self._count(cursor, STATUS_TODO, -1)
+            self._count(cursor, STATUS_IN_PROGRESS, 1)
+            return row[1]
+
+    def complete_url(self, url, docs=None, failed=False):
+        status = STATUS_FAILED if failed else STATUS_DONE
+        with self._transaction() as cursor:
+            # A claim whose lease expired is back in todo and will be crawled
+            # again, so a late completion is dropped.
+            completed = cursor.execute(
+                "UPDATE urls SET status = ?, updated = ? WHERE url = ? AND status = ?",
+                (status, time.time(), url, STATUS_IN_PROGRESS)
+            ).rowcount
+            if not completed:
+                return
+            self._count(cursor, STATUS_IN_PROGRESS, -1)
+            self._count(cursor, status, 1)
+            if docs is not None:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO docs (url, docs) VALUES (?, ?)",
+                    (url, json.dumps([{"page_content": doc.page_content, "metadata": doc.metadata}
+                                      for doc in docs]))
+                )
+
+    def release_claims(self, partition):
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO heartbeats (partition, heartbeat) VALUES (?, ?)", (partition, time.time())
+            )
+            return self._requeue(cursor, "partition = ?", (partition,))
+
+    def stale_partitions(self):
+        return self._stale_partitions(self.connection.cursor(), time.time())
+
+    def is_finished(self, max_sites):
+        # Any url left to crawl, in whichever partition, can still add urls to
+        # every other partition, so only stop once the whole crawl is idle.
+        stats = self.stats()
+        if stats[STATUS_IN_PROGRESS] > 0:
+            return False
+        return stats[STATUS_TODO] == 0 or stats[STATUS_DONE] + stats[STATUS_FAILED] >= max_sites
+
+    @staticmethod
+    def _counters(cursor):
+        return dict(cursor.execute("SELECT name, value FROM counters").fetchall())
+
+    def stats(self):
+        return self._counters(self.connection.cursor())
+
+    def get_site_docs(self):
+        site_docs = {}
+        for url, docs in self.connection.execute(
+                "SELECT docs.url, docs.docs FROM docs JOIN urls ON urls.url = docs.url ORDER BY urls.seq"):
+            site_docs[url] = [Document(page_content=doc["page_content"], metadata=doc["metadata"])
+                              for doc in json.loads(docs)]
+        return site_docs
+
+    def close(self):
+        self.connection.close()
@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 
@@ -11,6 +12,8 @@ from requests_aws4auth import AWS4Auth
 from dotenv import load_dotenv
 
 from utils.crawler import Crawler
+from utils.distributed_crawler import CrawlCoordinator
+from utils.frontier import SQLiteFrontier
 
 logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.INFO)
 
@@ -35,7 +38,18 @@ if __name__ == '__main__':
     )
     index_name = os.getenv("OPENSEARCH_INDEX")
 
-    crawler = Crawler(starturl=os.getenv('CRAWLER_URL'), max_sites=int(os.getenv('MAX_PAGES')))
+    num_workers = int(os.getenv('CRAWLER_WORKERS', '1'))
+    if num_workers > 1:
+        crawler = CrawlCoordinator(
+            starturl=os.getenv('CRAWLER_URL'),
+            frontier_factory=functools.partial(
+                SQLiteFrontier, os.getenv('CRAWLER_FRONTIER_DB', 'frontier.db'), num_workers
+            ),
+            num_workers=num_workers,
+            max_sites=int(os.getenv('MAX_PAGES'))
+        )
+    else:
+        crawler = Crawler(starturl=os.getenv('CRAWLER_URL'), max_sites=int(os.getenv('MAX_PAGES')))
     crawler.run()
 
     exit(0)